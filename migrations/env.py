@@ -3,7 +3,7 @@ from os import getenv
 from urllib.parse import quote_plus
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import Connection, engine_from_config, pool
 
 # Импортируем базовую модель SQLAlchemy
 from src.api.models import Base
@@ -121,6 +121,21 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection: Connection) -> None:
+    """Применяет миграции через переданное соединение."""
+    # Все ревизии применяются в одной транзакции (один COMMIT на весь upgrade).
+    # Это значение по умолчанию в Alembic, фиксируем его явно. Миграции с CONCURRENTLY
+    # сами выходят из транзакции через autocommit_block()
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=False,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -128,6 +143,12 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Соединение, переданное вызывающим кодом (например, тестами через config.attributes), используем повторно
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
     # Собираем конфигурацию вручную для надежности
     connectable_config = config.get_section(config.config_ini_section, {})
     connectable_config["sqlalchemy.url"] = current_db_url
@@ -140,10 +161,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+        do_run_migrations(connection)
 
 
 if context.is_offline_mode():
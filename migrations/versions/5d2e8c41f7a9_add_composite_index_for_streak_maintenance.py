@@ -0,0 +1,34 @@
+"""Add composite index for streak maintenance
+
+Revision ID: 5d2e8c41f7a9
+Revises: 140a41330e84
+Create Date: 2026-10-15 10:12:04.318275
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e8c41f7a9"
+down_revision: Union[str, Sequence[str], None] = "140a41330e84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_habitexecutions_habit_status_date",
+        "habitexecutions",
+        ["habit_id", "status", sa.text("execution_date DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_habitexecutions_habit_status_date", table_name="habitexecutions")
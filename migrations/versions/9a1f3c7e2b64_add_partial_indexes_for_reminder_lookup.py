@@ -0,0 +1,58 @@
+"""Add partial indexes for reminder lookup
+
+Revision ID: 9a1f3c7e2b64
+Revises: 5d2e8c41f7a9
+Create Date: 2026-10-15 11:04:52.907713
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a1f3c7e2b64"
+down_revision: Union[str, Sequence[str], None] = "5d2e8c41f7a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_habits_active_reminder",
+            "habits",
+            ["time_to_remind"],
+            unique=False,
+            postgresql_include=["user_id"],
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_tz",
+            "users",
+            ["timezone"],
+            unique=False,
+            postgresql_where=sa.text("NOT is_bot_blocked"),
+            postgresql_concurrently=True,
+        )
+        # Частичный индекс по привычкам полностью заменяет составной
+        op.drop_index("ix_habits_time_active", table_name="habits", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_habits_time_active",
+            "habits",
+            ["time_to_remind", "is_active"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_users_tz", table_name="users", postgresql_concurrently=True)
+        op.drop_index("ix_habits_active_reminder", table_name="habits", postgresql_concurrently=True)
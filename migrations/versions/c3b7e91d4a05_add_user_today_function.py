@@ -0,0 +1,36 @@
+"""Add user_today function
+
+Revision ID: c3b7e91d4a05
+Revises: 9a1f3c7e2b64
+Create Date: 2026-10-15 11:38:16.402519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3b7e91d4a05"
+down_revision: Union[str, Sequence[str], None] = "9a1f3c7e2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Текущая дата в часовом поясе пользователя.
+    # STABLE: now() неизменно в пределах транзакции, поэтому планировщик может встроить функцию в запрос
+    op.execute(
+        """
+        CREATE FUNCTION user_today(tz text) RETURNS date
+        LANGUAGE sql STABLE PARALLEL SAFE
+        AS $$ SELECT (now() AT TIME ZONE tz)::date $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION user_today(text);")
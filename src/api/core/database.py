@@ -1,10 +1,12 @@
 """Настройка подключения к базе данных с использованием SQLAlchemy."""
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
@@ -37,18 +39,19 @@ class Database:
         Использует `DATABASE_URL` из настроек.
 
         Args:
-            **kwargs: Дополнительные параметры для create_async_engine.
+            **kwargs: Дополнительные параметры для create_async_engine (переопределяют значения по умолчанию).
 
         Raises:
             RuntimeError: При неудачной проверке подключения.
         """
-        self.engine = create_async_engine(
-            str(settings.DATABASE_URL),
-            echo=settings.DEVELOPMENT,  # Включаем логирование SQL запросов в режиме DEVELOPMENT
-            pool_pre_ping=True,  # Проверять соединение перед использованием
-            pool_recycle=3600,  # Переподключение каждый час
+        engine_options: dict[str, Any] = {
+            "echo": settings.DEVELOPMENT,  # Включаем логирование SQL запросов в режиме DEVELOPMENT
+            "pool_pre_ping": True,  # Проверять соединение перед использованием
+            "pool_recycle": 3600,  # Переподключение каждый час
             **kwargs,
-        )
+        }
+
+        self.engine = create_async_engine(str(settings.DATABASE_URL), **engine_options)
 
         self.session_factory = async_sessionmaker(
             bind=self.engine,
@@ -61,6 +64,38 @@ class Database:
         await self._verify_connection()
         log.success("Подключение к базе данных установлено.")
 
+    async def warm_up(self, connections: int) -> None:
+        """
+        Заранее заполняет пул соединений.
+
+        Одновременно открывает указанное количество соединений и возвращает их в пул,
+        чтобы первые запросы не тратили время на установку соединения с БД.
+
+        Args:
+            connections (int): Количество соединений (не больше размера пула).
+
+        Raises:
+            RuntimeError: При вызове до инициализации подключения (`db.connect`).
+            Exception: Первая ошибка подключения (открытые к этому моменту соединения возвращаются в пул).
+        """
+        if not self.engine:
+            raise RuntimeError("База данных не инициализирована. Вызовите `await db.connect()` перед прогревом пула.")
+
+        engine = self.engine
+
+        # Удерживаем все соединения одновременно, иначе пул будет повторно выдавать одно и то же соединение.
+        # return_exceptions=True: даже если одно подключение не удалось, дожидаемся остальных,
+        # чтобы закрыть (вернуть в пул) все успешно открытые соединения
+        results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+
+        await asyncio.gather(*(result.close() for result in results if isinstance(result, AsyncConnection)))
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        log.debug(f"Пул соединений с БД прогрет ({connections} соединений).")
+
     async def disconnect(self) -> None:
         """Корректное закрытие подключения к базе данных."""
         if self.engine:
@@ -4,7 +4,7 @@ from datetime import date
 from enum import Enum as PyEnum  # Чтобы не конфликтовать с sqlalchemy.Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Date, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -48,5 +48,10 @@ class HabitExecution(Base):
     # Связи
     habit: Mapped["Habit"] = relationship(back_populates="executions")
 
-    # Уникальное ограничение на (habit_id, execution_date), гарантирует одну запись на день на привычку
-    __table_args__ = (UniqueConstraint("habit_id", "execution_date", name="uq_habit_execution_per_day"),)
+    __table_args__ = (
+        # Уникальное ограничение на (habit_id, execution_date), гарантирует одну запись на день на привычку
+        UniqueConstraint("habit_id", "execution_date", name="uq_habit_execution_per_day"),
+        # Составной индекс для планировщика (сброс стриков), позволяет проверять наличие выполнений (DONE)
+        # привычки за диапазон дат одним поиском по индексу
+        Index("ix_habitexecutions_habit_status_date", "habit_id", "status", text("execution_date DESC")),
+    )
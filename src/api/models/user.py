@@ -2,7 +2,7 @@
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String
+from sqlalchemy import BigInteger, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -39,3 +39,6 @@ class User(Base):
 
     # Связи
     habits: Mapped[list["Habit"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+
+    # Частичный индекс для планировщика: таймзоны только тех, кто не заблокировал бота
+    __table_args__ = (Index("ix_users_tz", "timezone", postgresql_where=text("NOT is_bot_blocked")),)
@@ -3,9 +3,9 @@
 from datetime import date, time
 from typing import Any, Sequence
 
-from sqlalchemy import ColumnElement, select
+from sqlalchemy import ColumnElement, Date, String, Time, and_, column, func, or_, select, true, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, selectinload
 
 from src.api.core.config import settings  # Для значения target_days по умолчанию
 from src.api.core.logging import api_log as log
@@ -186,33 +186,43 @@ class HabitRepository(BaseRepository[Habit, HabitSchemaCreate, HabitSchemaUpdate
 
         return result.scalars().all()
 
-    async def get_habits_for_notification(
+    async def get_habits_for_notification_bulk(
         self,
         db_session: AsyncSession,
-        timezone: str,
-        target_time: time,
-        target_date: date,
+        targets: Sequence[tuple[str, time, date]],
     ) -> Sequence[Habit]:
         """
-        Находит активные привычки, которые еще не были выполнены,
-        для отправки уведомлений в конкретном часовом поясе.
+        Находит активные привычки, которые еще не были выполнены, сразу для нескольких часовых поясов.
+
+        Вместо отдельного запроса на каждую таймзону выполняет один запрос,
+        соединяя привычки с набором строк VALUES (таймзона, время, дата).
 
         Args:
             db_session (AsyncSession): Асинхронная сессия базы данных.
-            timezone (str): Часовой пояс (например, 'Europe/Moscow').
-            target_time (time): Время напоминания (ЧЧ:ММ:00).
-            target_date (date): Локальная дата пользователя (для проверки выполнения).
+            targets (Sequence[tuple[str, time, date]]): Кортежи (таймзона, время напоминания ЧЧ:ММ:00,
+                                                         локальная дата пользователя) для каждой таймзоны.
 
         Returns:
-            Sequence[Habit]: Список привычек пользователя, о выполнении которых нужно напомнить.
+            Sequence[Habit]: Список привычек, о выполнении которых нужно напомнить, отсортированный по таймзоне.
         """
-        # Подзапрос: находим ID привычек, которые уже выполнены (DONE) на целевую дату
+        if not targets:
+            return []
+
+        # Набор целевых значений (таймзона, время, дата) в виде таблицы VALUES
+        notification_targets = values(
+            column("timezone", String),
+            column("target_time", Time),
+            column("target_date", Date),
+            name="notification_targets",
+        ).data(list(targets))
+
+        # Подзапрос: находим ID привычек, которые уже выполнены (DONE) на локальную дату своей таймзоны
         has_done_execution = (
             select(1)
             .where(
                 HabitExecution.habit_id == self.model.id,
                 HabitExecution.status == HabitExecutionStatus.DONE,
-                HabitExecution.execution_date == target_date,
+                HabitExecution.execution_date == notification_targets.c.target_date,
             )
             .exists()
         )
@@ -220,19 +230,91 @@ class HabitRepository(BaseRepository[Habit, HabitSchemaCreate, HabitSchemaUpdate
         statement = (
             select(self.model)
             .join(self.model.user)
+            # Фильтры по индексам: таймзона пользователя и время напоминания должны совпасть с одной из строк VALUES
+            .join(
+                notification_targets,
+                and_(
+                    User.timezone == notification_targets.c.timezone,
+                    self.model.time_to_remind == notification_targets.c.target_time,
+                ),
+            )
             .where(
                 # Фильтры активности
                 self.model.is_active.is_(True),  # Только активные привычки
                 User.is_active.is_(True),  # Только активным юзерам
                 User.is_bot_blocked.is_(False),  # Которые не заблочили бота
-                # Фильтры по индексам
-                User.timezone == timezone,
-                self.model.time_to_remind == target_time,
                 # Фильтр "еще не выполнены"
                 ~has_done_execution,
             )
-            # Подгружаем юзера, чтобы знать telegram_id для отправки
-            .options(selectinload(self.model.user))
+            # Сортируем по таймзоне, чтобы вызывающий код мог сгруппировать результат
+            .order_by(User.timezone)
+            # Заполняем связь user из уже присоединенной таблицы users (без дополнительного SELECT),
+            # чтобы знать telegram_id для отправки
+            .options(contains_eager(self.model.user))
+        )
+
+        result = await db_session.execute(statement)
+
+        return result.scalars().all()
+
+    async def reset_missed_streaks(self, db_session: AsyncSession) -> Sequence[int]:
+        """
+        Сбрасывает в 0 стрики активных привычек, пропущенных вчера (по часовому поясу пользователя).
+
+        Стрик сбрасывается, если у привычки нет выполнения (DONE) ни за "вчера", ни за "сегодня".
+        Выполняется одним запросом UPDATE ... RETURNING. Коммит транзакции остается за вызывающим кодом.
+
+        Args:
+            db_session (AsyncSession): Асинхронная сессия базы данных.
+
+        Returns:
+            Sequence[int]: ID привычек, у которых был сброшен стрик.
+        """
+        # CTE: "Сегодняшняя дата" каждого пользователя вычисляется один раз на пользователя,
+        # а не внутри подзапроса для каждой строки выполнения, что позволяет планировщику сделать hash join.
+        # user_today(tz) - SQL-функция из миграций: (now() AT TIME ZONE tz)::date
+        user_dates = select(
+            User.id.label("user_id"),
+            func.user_today(User.timezone, type_=Date).label("today"),
+        ).cte("user_dates")
+
+        # LATERAL-подзапрос: дата последнего выполнения ('DONE') привычки не позже "сегодня" (по времени юзера).
+        # MAX по составному индексу (habit_id, status, execution_date DESC) - это чтение одной записи индекса
+        # на привычку вместо двух отдельных проверок EXISTS. Агрегат без GROUP BY всегда возвращает одну строку
+        # (NULL, если выполнений нет), поэтому достаточно обычного JOIN ... ON TRUE
+        last_done_execution = (
+            select(func.max(HabitExecution.execution_date).label("last_done"))
+            .where(
+                HabitExecution.habit_id == self.model.id,
+                HabitExecution.status == HabitExecutionStatus.DONE,
+                HabitExecution.execution_date <= user_dates.c.today,
+            )
+            .lateral("last_done_execution")
+        )
+
+        # Подзапрос: ID привычек для сброса
+        candidates_statement = (
+            select(self.model.id)
+            .join(user_dates, user_dates.c.user_id == self.model.user_id)
+            .join(last_done_execution, true())
+            .where(
+                self.model.is_active.is_(True),
+                self.model.current_streak > 0,
+                # Если выполнений не было вовсе или последнее было раньше "вчера"
+                or_(
+                    last_done_execution.c.last_done.is_(None),
+                    last_done_execution.c.last_done < user_dates.c.today - 1,
+                ),
+            )
+        )
+
+        # Сбрасываем стрик в 0 одним запросом UPDATE ... WHERE id IN (<кандидаты>) RETURNING id:
+        # отбор кандидатов и обновление выполняются за один round-trip, без передачи списка ID туда и обратно
+        statement = (
+            update(self.model)
+            .where(self.model.id.in_(candidates_statement.scalar_subquery()))
+            .values(current_streak=0)
+            .returning(self.model.id)
         )
 
         result = await db_session.execute(statement)
@@ -1,5 +1,8 @@
 """Репозиторий для работы с моделью User."""
 
+from typing import Sequence
+
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.core.logging import api_log as log
@@ -33,3 +36,29 @@ class UserRepository(BaseRepository[User, UserSchemaCreate, UserSchemaUpdate]):
         log.debug(f"Пользователь с Telegram ID {telegram_id} {status}.")
 
         return user
+
+    async def mark_bot_blocked(self, db_session: AsyncSession, *, telegram_ids: Sequence[int]) -> Sequence[int]:
+        """
+        Помечает пользователей как заблокировавших бота (`is_bot_blocked=True`).
+
+        Выполняется одним запросом UPDATE ... RETURNING, без предварительной загрузки пользователей.
+        Коммит транзакции остается за вызывающим кодом.
+
+        Args:
+            db_session (AsyncSession): Асинхронная сессия базы данных.
+            telegram_ids (Sequence[int]): Уникальные идентификаторы пользователей в Telegram.
+
+        Returns:
+            Sequence[int]: ID обновленных пользователей (не найденные пользователи пропускаются).
+        """
+        log.debug(f"Установка флага is_bot_blocked для пользователей с Telegram ID: {telegram_ids}")
+        statement = (
+            update(self.model)
+            .where(self.model.telegram_id.in_(telegram_ids))
+            .values(is_bot_blocked=True)
+            .returning(self.model.id)
+        )
+
+        result = await db_session.execute(statement)
+
+        return result.scalars().all()
@@ -59,11 +59,9 @@ def setup_logger(
     else:
         current_config = log_config
 
-    # Применяем переопределения, если они есть
-    if log_level_override:
-        current_config.level = log_level_override.upper()
-    else:
-        current_config.level = current_config.level.upper()
+    # Применяем переопределение уровня, если оно есть.
+    # Нормализуем уровень в локальную переменную, не изменяя переданный объект конфигурации
+    level = (log_level_override or current_config.level).upper()
 
     # Удаляем все предыдущие обработчики, чтобы избежать дублирования
     global_loguru_logger.remove()
@@ -76,7 +74,7 @@ def setup_logger(
     # Обработчик для вывода в консоль (stderr)
     service_specific_logger.add(
         sys.stderr,
-        level=current_config.level,
+        level=level,
         format=current_config.format,
         colorize=True,
         serialize=current_config.serialize,
@@ -87,12 +85,10 @@ def setup_logger(
         # Меняем service_name
         log_file_path_formatted = current_config.log_file_path.replace("{service_name}", service_name.lower())
 
-        # Вычисляем директорию. Разбиваем строку по "{time}", чтобы отсечь динамическую часть имени файла.
-        # Если в пути нет {time}, берем просто директорию от файла.
-        if "{time}" in log_file_path_formatted:
-            log_dir = os.path.dirname(log_file_path_formatted.split("{time}")[0])
-        else:
-            log_dir = os.path.dirname(log_file_path_formatted)
+        # Вычисляем директорию. Отсекаем динамическую часть имени файла, начиная с "{time" (формат Loguru
+        # `{time:YYYY-MM-DD}`), за один проход. Если в пути нет {time}, prefix - это весь путь к файлу.
+        prefix, _, _ = log_file_path_formatted.partition("{time")
+        log_dir = os.path.dirname(prefix)
 
         # Пытаемся создать директорию
         if log_dir and not os.path.exists(log_dir):
@@ -107,7 +103,7 @@ def setup_logger(
         else:
             service_specific_logger.add(
                 log_file_path_formatted,
-                level=current_config.level,
+                level=level,
                 format=current_config.format,
                 rotation=current_config.rotation,
                 retention=current_config.retention,
@@ -115,7 +111,7 @@ def setup_logger(
                 encoding="utf-8",
             )
 
-    service_specific_logger.info(f"Loguru сконфигурирован. Уровень: {current_config.level}")
+    service_specific_logger.info(f"Loguru сконфигурирован. Уровень: {level}")
     return service_specific_logger
 
 
@@ -3,17 +3,6 @@
 from logging import ERROR, INFO  # Стандартные уровни логирования для Sentry
 from typing import Protocol  # Используем Protocol для определения "контракта" настроек
 
-from sentry_sdk import init as sentry_init
-from sentry_sdk import set_tag
-from sentry_sdk.integrations.aiohttp import AioHttpIntegration
-from sentry_sdk.integrations.asyncio import AsyncioIntegration
-from sentry_sdk.integrations.celery import CeleryIntegration
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.loguru import LoguruIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from sentry_sdk.integrations.starlette import StarletteIntegration
-from sentry_sdk.integrations.threading import ThreadingIntegration
-
 from src.core_shared.logging_setup import setup_logger
 
 # Создаем экземпляр логгера для процесса настройки Sentry
@@ -50,17 +39,36 @@ def setup_sentry(settings: SentrySettingsProtocol, service_name: str) -> None:
         sentry_log.warning(f"SENTRY_DSN не установлен. Мониторинг ошибок для {service_name} отключен.")
         return
 
+    # Импортируем SDK и интеграции только после проверки DSN:
+    # если Sentry отключен, сервис не тратит время на импорт интеграций (Starlette, FastAPI, SQLAlchemy, Celery...)
+    from sentry_sdk import init as sentry_init
+    from sentry_sdk import set_tag
+    from sentry_sdk.integrations.aiohttp import AioHttpIntegration
+    from sentry_sdk.integrations.asyncio import AsyncioIntegration
+    from sentry_sdk.integrations.celery import CeleryIntegration
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.loguru import LoguruIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+    from sentry_sdk.integrations.threading import ThreadingIntegration
+
     # --- Определяем параметры Sentry ---
 
+    # Режим работы (читаем свойство один раз)
+    is_production = settings.PRODUCTION
+
     # Окружение (Environment)
-    environment = "production" if settings.PRODUCTION else "development"
+    environment = "production" if is_production else "development"
+
+    # Релиз (Release)
+    release = f"{settings.PROJECT_NAME}@{settings.API_VERSION}"
 
     # Частота семплирования для Performance Monitoring (Traces)
     # Установим 10% для production, 100% для development
-    traces_sample_rate = 0.1 if settings.PRODUCTION else 1.0
+    traces_sample_rate = 0.1 if is_production else 1.0
 
     # Частота семплирования для Profiling аналогично трейсам
-    profiles_sample_rate = 0.1 if settings.PRODUCTION else 1.0
+    profiles_sample_rate = traces_sample_rate
 
     # Уровни логирования для интеграции
     log_level_breadcrumbs = INFO  # Уровень для breadcrumbs
@@ -72,7 +80,7 @@ def setup_sentry(settings: SentrySettingsProtocol, service_name: str) -> None:
         sentry_init(
             dsn=sentry_dsn,
             environment=environment,
-            release=f"{settings.PROJECT_NAME}@{settings.API_VERSION}",
+            release=release,
             # Настройка производительности
             traces_sample_rate=traces_sample_rate,
             profiles_sample_rate=profiles_sample_rate,
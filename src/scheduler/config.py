@@ -17,6 +17,9 @@ class Settings(AppSettings):
     # Настройки Telegram (для отправки уведомлений)
     BOT_TOKEN: str = Field(..., description="Токен бота")
 
+    # Настройки Redis (дедупликация задач уведомлений)
+    REDIS_URL: str = Field(default="redis://redis:6379/0", description="URL брокера сообщений Redis")
+
     # Настройки логирования
     LOG_LEVEL: str = Field(default="INFO", description="Уровень логирования")
 
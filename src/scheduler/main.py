@@ -16,11 +16,14 @@ from src.api.core.database import db
 from src.core_shared.logging_setup import setup_logger
 from src.core_shared.sentry_sdk_setup import setup_sentry
 from src.scheduler.config import settings
-from src.scheduler.tasks import daily_maintenance, schedule_reminders
+from src.scheduler.tasks import daily_maintenance, redis_client, schedule_reminders
 
 # Настраиваем логгер
 log = setup_logger("SchedulerMain", log_level_override=settings.LOG_LEVEL)
 
+# Размер пула соединений с БД (все соединения открываются при старте)
+DB_POOL_SIZE = 10
+
 
 async def main() -> None:
     """Запуск сервиса планировщика."""
@@ -31,11 +34,15 @@ async def main() -> None:
 
     log.info("⏳ Запуск сервиса планировщика (Scheduler Service)...")
 
-    # Инициализируем подключение к базе данных
+    # Инициализируем подключение к базе данных и заранее открываем соединения пула,
+    # чтобы ежеминутные задачи не тратили время на установку соединения
     try:
-        await db.connect()
+        await db.connect(pool_size=DB_POOL_SIZE, max_overflow=0, pool_pre_ping=False)
+        await db.warm_up(DB_POOL_SIZE)
     except Exception as exc:
         log.critical(f"Не удалось подключиться к БД: {exc}")
+        # Закрываем пул, если движок успел создаться (например, упал только прогрев)
+        await db.disconnect()
         return
 
     # Настраиваем планировщик (AsyncIOScheduler работает поверх asyncio event loop)
@@ -87,6 +94,9 @@ async def main() -> None:
         # Закрываем соединение с базой данных
         await db.disconnect()
 
+        # Закрываем соединения с Redis
+        await redis_client.aclose()
+
         log.info("Планировщик (Scheduler) остановлен корректно.")
 
 
@@ -4,21 +4,103 @@
 Генерирует события для Celery worker'ов и выполняет обслуживание БД.
 """
 
-from datetime import datetime, timezone
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from itertools import groupby
+from typing import Any
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from sqlalchemy import select, text, update
+from celery import group
+from redis.asyncio import Redis
 
 from src.api.core.database import db
-from src.api.models import Habit, HabitExecution, HabitExecutionStatus, User
+from src.api.models import Habit
 from src.api.repositories import HabitRepository
 from src.core_shared.logging_setup import setup_logger
 from src.scheduler.config import settings
-from src.worker.tasks import send_habit_notification_task
+from src.worker.celery_app import celery_app
+from src.worker.tasks import NOTIFICATION_BATCH_SIZE, send_habit_notifications_batch_task
 
 # Настраиваем логгер
 log = setup_logger("SchedulerTasks", log_level_override=settings.LOG_LEVEL)
 
+# Асинхронный клиент Redis для дедупликации задач уведомлений
+redis_client = Redis.from_url(settings.REDIS_URL)
+
+# Время жизни ключа дедупликации (в секундах).
+# Достаточно, чтобы перекрыть повторный или наложившийся запуск планировщика в пределах той же минуты
+REMINDER_DEDUP_TTL = 120
+
+
+@lru_cache(maxsize=512)
+def _get_zone(timezone_name: str) -> ZoneInfo:
+    """
+    Возвращает объект часового пояса по его имени (IANA), кэшируя результат.
+
+    Набор таймзон пользователей почти не меняется между запусками планировщика,
+    поэтому объекты переиспользуются без повторного поиска в tzdata.
+
+    Args:
+        timezone_name (str): Название часового пояса (например, 'Europe/Moscow').
+
+    Returns:
+        ZoneInfo: Объект часового пояса.
+
+    Raises:
+        ZoneInfoNotFoundError: Если часовой пояс не найден (ошибки не кэшируются).
+    """
+    return ZoneInfo(timezone_name)
+
+
+async def _filter_already_enqueued(notifications: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Отбрасывает уведомления, задачи для которых уже были поставлены в очередь.
+
+    Для каждого уведомления выполняет `SET NX EX` ключа дедупликации. Все команды отправляются
+    одним pipeline (один round-trip до Redis), в очередь попадают только уведомления, чей ключ был установлен.
+
+    Args:
+        notifications (list[dict[str, Any]]): Аргументы задачи `send_habit_notification_task` для каждого уведомления.
+
+    Returns:
+        list[dict[str, Any]]: Уведомления, которые еще не ставились в очередь.
+    """
+    if not notifications:
+        return []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for notification in notifications:
+            pipe.set(f"reminder:dedup:{notification['idempotency_key']}", 1, nx=True, ex=REMINDER_DEDUP_TTL)
+
+        is_new_flags = await pipe.execute()
+
+    return [notification for notification, is_new in zip(notifications, is_new_flags, strict=True) if is_new]
+
+
+def _enqueue_notifications(notifications: list[dict[str, Any]]) -> None:
+    """
+    Отправляет уведомления в очередь Celery пакетами одной группой через одно соединение с брокером.
+
+    Уведомления делятся на пакеты по `NOTIFICATION_BATCH_SIZE`, каждый пакет - одна задача
+    `send_habit_notifications_batch_task`. Все задачи тика регистрируются одним вызовом `group(...).apply_async()`
+    с общим producer из пула (одно соединение и канал Redis) вместо захвата соединения на каждый вызов `.delay()`.
+    Функция синхронная (блокирующий I/O), поэтому вызывается через `asyncio.to_thread`.
+
+    Args:
+        notifications (list[dict[str, Any]]): Аргументы задачи `send_habit_notification_task` для каждого уведомления.
+    """
+    if not notifications:
+        return
+
+    signatures = [
+        send_habit_notifications_batch_task.s(notifications=notifications[start : start + NOTIFICATION_BATCH_SIZE])
+        for start in range(0, len(notifications), NOTIFICATION_BATCH_SIZE)
+    ]
+
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        group(signatures).apply_async(producer=producer)
+
 
 async def schedule_reminders() -> None:
     """
@@ -27,8 +109,10 @@ async def schedule_reminders() -> None:
     Алгоритм работы:
     1. Получает список уникальных активных таймзон из БД.
     2. Для каждой таймзоны вычисляет текущее локальное время.
-    3. Делает точечный запрос к БД для поиска привычек на это время.
-    4. Отправляет задачи в очередь Celery (Redis).
+    3. Делает один запрос к БД для поиска привычек на это время сразу по всем таймзонам.
+    4. Отбрасывает уже поставленные в очередь уведомления (дедупликация через Redis).
+    5. Отправляет уведомления всех таймзон в очередь Celery (Redis) пакетными задачами одной группой
+       через одно соединение с брокером.
     """
     log.info("🔍 Запуск проверки напоминаний...")
 
@@ -41,53 +125,78 @@ async def schedule_reminders() -> None:
             # Получаем список уникальных таймзон
             active_timezones = await habit_repo.get_active_timezones(db_session=session)
 
-            # Текущее время сервера (всегда UTC)
-            utc_now = datetime.now(timezone.utc)
+            # Текущее время сервера (всегда UTC), без секунд и без tzinfo:
+            # дальше к нему только прибавляются смещения таймзон
+            utc_now = datetime.now(timezone.utc).replace(second=0, microsecond=0, tzinfo=None)
+
+            # Локальные время и дата для каждой таймзоны: {таймзона: (ЧЧ:ММ:00, дата)}
+            local_targets: dict[str, tuple[time, date]] = {}
 
             for timezone_name in active_timezones:
                 try:
-                    # Вычисляем локальное время
-                    local_now = utc_now.astimezone(ZoneInfo(timezone_name))
-
-                    # Нам нужны часы и минуты (ЧЧ:ММ:00)
-                    target_time = local_now.time().replace(second=0, microsecond=0)
-                    target_date = local_now.date()
-
-                    # Получаем привычки, о которых нужно напомнить
-                    habits_to_remind = await habit_repo.get_habits_for_notification(
-                        db_session=session,
-                        timezone=timezone_name,
-                        target_time=target_time,
-                        target_date=target_date,
-                    )
+                    zone = _get_zone(timezone_name)
+                except ZoneInfoNotFoundError:
+                    log.error(f"Неизвестная таймзона в БД: {timezone_name}")
+                    continue
+
+                # Смещение таймзоны относительно UTC на текущий момент.
+                # fromutc() учитывает переходы на летнее время по UTC-моменту,
+                # поэтому смещение корректно и в часы перевода стрелок.
+                # utcoffset() типизирован как timedelta | None, но у datetime с ZoneInfo смещение задано всегда
+                offset = zone.fromutc(utc_now.replace(tzinfo=zone)).utcoffset() or timedelta(0)
+
+                # Локальное время - простая арифметика над наивным datetime (ЧЧ:ММ:00)
+                local_now = utc_now + offset
+                local_targets[timezone_name] = (local_now.time(), local_now.date())
+
+            # Получаем привычки, о которых нужно напомнить, одним запросом по всем таймзонам
+            habits_to_remind = await habit_repo.get_habits_for_notification_bulk(
+                db_session=session,
+                targets=[
+                    (timezone_name, target_time, target_date)
+                    for timezone_name, (target_time, target_date) in local_targets.items()
+                ],
+            )
 
-                    if not habits_to_remind:
-                        continue
+            # Уведомления всех таймзон, которые будут отправлены в очередь одной группой
+            all_notifications: list[dict[str, Any]] = []
+
+            # Привычки отсортированы по таймзоне, поэтому группируем их за один проход
+            for timezone_name, timezone_habits in groupby(habits_to_remind, key=lambda habit: habit.user.timezone):
+                try:
+                    target_time, target_date = local_targets[timezone_name]
+                    habits_in_timezone = list(timezone_habits)
 
                     log.info(
                         f"({timezone_name}) {target_time}: "
-                        f"Найдено {len(habits_to_remind)} привычек для отправки уведомлений."
+                        f"Найдено {len(habits_in_timezone)} привычек для отправки уведомлений."
                     )
 
-                    for habit in habits_to_remind:
-                        if not habit.user.telegram_id:
-                            continue
+                    notifications: list[dict[str, Any]] = []
 
+                    # Заблокировавшие бота пользователи отсеяны в запросе, telegram_id - NOT NULL,
+                    # поэтому каждая найденная привычка - живой получатель
+                    for habit in habits_in_timezone:
                         # Формируем уникальный ключ идемпотентности (ID привычки + Дата + Часы:Минуты)
                         idempotency_key = f"{habit.id}_{target_date.isoformat()}_{target_time.strftime('%H%M')}"
 
-                        # Отправляем задачу в очередь Celery
-                        send_habit_notification_task.delay(
-                            chat_id=habit.user.telegram_id,
-                            habit_name=habit.name,
-                            idempotency_key=idempotency_key,
-                        )  # .delay() - асинхронная отправка, возвращает управление мгновенно
+                        notifications.append(
+                            {
+                                "chat_id": habit.user.telegram_id,
+                                "habit_name": habit.name,
+                                "idempotency_key": idempotency_key,
+                            }
+                        )
+
+                    # Пропускаем уведомления, которые уже были поставлены в очередь (повторный запуск тика)
+                    all_notifications.extend(await _filter_already_enqueued(notifications))
 
-                except ZoneInfoNotFoundError:
-                    log.error(f"Неизвестная таймзона в БД: {timezone_name}")
                 except Exception as exc:
                     log.error(f"Ошибка обработки таймзоны {timezone_name}: {exc}", exc_info=True)
 
+            # Отправляем задачи всех таймзон в очередь Celery одной группой, не блокируя event loop
+            await asyncio.to_thread(_enqueue_notifications, all_notifications)
+
         # Глобальная ошибка (например, отвал БД)
         except Exception as exc:
             log.error(f"💥 Критическая ошибка в schedule_reminders: {exc}", exc_info=True)
@@ -113,66 +222,14 @@ async def daily_maintenance() -> None:
         # но нет записи о выполнении за "вчера" (по таймзоне юзера)
 
         try:
-            # Конвертируем UTC время сервера в локальное время пользователя, используя его timezone
-
-            # Функция `timezone(zone_name, timestamp)` специфична для PostgreSQL
-            # Она конвертирует время из одной зоны в другую внутри SQL-запроса
-
-            # SQL-выражение "Вчерашняя дата" для конкретного пользователя
-            user_yesterday = text("(timezone(users.timezone, now())::date - 1)")
-
-            # SQL-выражение "Сегодняшняя дата" для конкретного пользователя
-            user_today = text("timezone(users.timezone, now())::date")
-
-            # Подзапрос: существует ли запись выполнения ('DONE') для этой привычки на "вчера" (по времени юзера)
-            has_done_yesterday = (
-                select(1)
-                .where(
-                    HabitExecution.habit_id == Habit.id,
-                    HabitExecution.status == HabitExecutionStatus.DONE,
-                    HabitExecution.execution_date == user_yesterday,
-                )
-                .exists()
-            )
-
-            # Подзапрос: существует ли запись выполнения ('DONE') для этой привычки на "сегодня" (по времени юзера)
-            has_done_today = (
-                select(1)
-                .where(
-                    HabitExecution.habit_id == Habit.id,
-                    HabitExecution.status == HabitExecutionStatus.DONE,
-                    HabitExecution.execution_date == user_today,
-                )
-                .exists()
-            )
-
-            # Находим ID привычек для сброса
-            # Явно джойним User'а, чтобы выражения users.timezone сработали
-            candidates_statement = (
-                select(Habit.id)
-                .join(User)
-                .where(
-                    Habit.is_active.is_(True),
-                    Habit.current_streak > 0,
-                    ~has_done_yesterday,  # Если вчера не было выполнения (`~` - отрицание)
-                    ~has_done_today,  # И сегодня еще не было выполнения (`~` - отрицание)
-                )
-            )
-
-            result = await session.execute(candidates_statement)
-
-            habit_ids_to_reset = result.scalars().all()
-
-            if habit_ids_to_reset:
-                # Массово обновляем привычки (сбрасываем стрик в 0)
-                update_statement = update(Habit).where(Habit.id.in_(habit_ids_to_reset)).values(current_streak=0)
-
-                await session.execute(update_statement)
+            # Даты "сегодня" и "вчера" вычисляются в SQL по таймзоне каждого пользователя
+            reset_habit_ids = await HabitRepository(Habit).reset_missed_streaks(db_session=session)
 
-                # Фиксируем изменения
-                await session.commit()
+            # Фиксируем изменения
+            await session.commit()
 
-                log.info(f"📉 Сброшен стрик у {len(habit_ids_to_reset)} пропущенных привычек.")
+            if reset_habit_ids:
+                log.info(f"📉 Сброшен стрик у {len(reset_habit_ids)} пропущенных привычек.")
 
             else:
                 log.debug("Нет привычек для сброса стрика в этом часе.")
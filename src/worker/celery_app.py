@@ -13,26 +13,27 @@ from src.core_shared.sentry_sdk_setup import setup_sentry
 if settings.SENTRY_DSN:
     setup_sentry(settings, service_name="Worker")
 
-# Создаем экземпляр приложения
+# Создаем экземпляр приложения.
+# Бэкенд результатов не подключаем: результаты задач никто не читает
 celery_app = Celery(
     "habit_tracker_worker",
     broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL,
 )
 
 # Обновляем конфигурацию
 celery_app.conf.update(
-    # Формат передачи данных
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # Формат передачи данных: msgpack компактнее и быстрее JSON,
+    # json оставляем в accept_content для сообщений, уже лежащих в очереди
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    # Не сохраняем ни результаты, ни ошибки задач (ошибки попадают в логи и Sentry)
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
     # Часовой пояс
     timezone="UTC",
     enable_utc=True,
     # Обработка потери соединения с брокером при старте
     broker_connection_retry_on_startup=True,
-    # Глобальный Rate Limit
-    task_default_rate_limit="30/s",
 )
 
 # Автоматически находим и регистрируем задачи в модуле tasks
@@ -4,15 +4,34 @@
 Содержит логику отправки сообщений в Telegram и служебные задачи.
 """
 
-from typing import Any
+import asyncio
+import html
+import os
+import random
+import ssl
+from functools import lru_cache
+from typing import Any, Coroutine, TypeVar
 
+import certifi
 from aiogram import Bot
+from aiogram import __version__ as aiogram_version
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
-from asgiref.sync import async_to_sync
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+from celery.signals import worker_process_init, worker_process_shutdown
 from celery.utils.log import get_task_logger
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
+from redis.exceptions import RedisError
+
+try:
+    # uvloop (приходит вместе с uvicorn[standard]) - более быстрая реализация event loop на libuv
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop не поддерживает Windows
+    uvloop = None  # type: ignore[assignment]
 
 from src.api.core.config import settings
 from src.api.core.database import db
@@ -23,76 +42,366 @@ from src.worker.celery_app import celery_app
 # Специальный логгер для Celery задач
 logger = get_task_logger(__name__)
 
-# Клиент Redis для механизма блокировок (Idempotency Lock)
-redis_client = Redis.from_url(settings.REDIS_URL)
+# Клиент Redis для механизма блокировок (Idempotency Lock).
+# Блокирующий пул ограничивает число соединений процесса: при исчерпании задача ждет свободное соединение,
+# а не открывает новое TCP-соединение
+redis_client = Redis(
+    connection_pool=BlockingConnectionPool.from_url(settings.REDIS_URL, max_connections=32, socket_keepalive=True)
+)
+
+# TTL ключа идемпотентности уведомления (в секундах): ключ протухнет через 24 часа (для автоочистки)
+NOTIFICATION_LOCK_TTL = 86400
+
+# Lua-скрипт установки ключа идемпотентности: SET NX EX атомарно внутри Redis за один round-trip.
+# Возвращает 1, если ключ установлен (уведомление еще не отправлялось), иначе 0.
+# Скрипт регистрируется один раз и дальше вызывается через EVALSHA (без передачи текста скрипта)
+_acquire_notification_lock = redis_client.register_script(
+    """
+    if redis.call('SET', KEYS[1], 'sent', 'NX', 'EX', ARGV[1]) then
+        return 1
+    end
+    return 0
+    """
+)
+
+# Общий для всех воркеров лимит отправки сообщений в Telegram (token bucket в Redis).
+# Telegram разрешает боту ~30 сообщений в секунду, лимит Celery `rate_limit` же действует
+# в каждом процессе отдельно и при масштабировании воркеров умножается
+TELEGRAM_RATE_LIMIT_KEY = "bucket:telegram:global"
+TELEGRAM_RATE_LIMIT_PER_SECOND = 25  # Скорость пополнения корзины (токенов в секунду)
+TELEGRAM_RATE_LIMIT_BURST = 25  # Емкость корзины (максимальный всплеск)
+
+# Негативный кэш пользователей, заблокировавших бота: уведомления, уже стоящие в очереди, пропускаются
+# без запроса к Telegram. Флаг в БД исключает таких пользователей из следующих рассылок,
+# поэтому кэшу достаточно пережить задачи, поставленные в очередь до блокировки
+BLOCKED_CHAT_KEY = "blocked:{chat_id}"
+BLOCKED_CHAT_TTL = 3600  # (в секундах)
+
+# Lua-скрипт token bucket: атомарно пополняет корзину по прошедшему времени и пытается взять ARGV[3] токенов
+# (по умолчанию один). Время берется из Redis (TIME), чтобы расхождение часов между воркерами не влияло на лимит.
+# Если передан ключ KEYS[2] и он существует (пользователь заблокировал бота), токены не расходуются.
+# Возвращает {<сколько токенов выдано>, <сколько миллисекунд ждать до следующего токена, если выдано меньше>}
+# или {-1, 0} для заблокированного пользователя
+_take_telegram_token = redis_client.register_script(
+    """
+    if KEYS[2] and redis.call('EXISTS', KEYS[2]) == 1 then
+        return {-1, 0}
+    end
+
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local requested = tonumber(ARGV[3]) or 1
+
+    local redis_time = redis.call('TIME')
+    local now_ms = tonumber(redis_time[1]) * 1000 + math.floor(tonumber(redis_time[2]) / 1000)
+
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'last_refill')
+    local tokens = tonumber(bucket[1]) or capacity
+    local last_refill = tonumber(bucket[2]) or now_ms
+
+    tokens = math.min(capacity, tokens + (now_ms - last_refill) * rate / 1000)
+
+    local granted = math.min(requested, math.floor(tokens))
+    local wait_ms = 0
+
+    tokens = tokens - granted
+
+    if granted < requested then
+        wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'last_refill', now_ms)
+    -- Полная корзина неотличима от отсутствующей, поэтому ключ можно удалить после полного пополнения
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+
+    return {granted, wait_ms}
+    """
+)
+
+# Параметры пула соединений aiohttp к Telegram Bot API
+TELEGRAM_CONNECTIONS_LIMIT = 50  # Общий лимит одновременных соединений
+TELEGRAM_CONNECTIONS_LIMIT_PER_HOST = 30  # Лимит соединений к одному хосту (api.telegram.org)
+TELEGRAM_DNS_CACHE_TTL = 600  # TTL кэша DNS (в секундах)
+TELEGRAM_KEEPALIVE_TIMEOUT = 75  # Время жизни keep-alive соединения (в секундах)
+
+# Пакетная отправка уведомлений (см. `send_habit_notifications_batch_task`)
+NOTIFICATION_BATCH_SIZE = 25  # Уведомлений в одной задаче (не больше емкости корзины токенов)
+TELEGRAM_SEND_CONCURRENCY = 10  # Одновременных запросов к Telegram внутри одной задачи
+
+# Параметры пула соединений с БД процесса воркера.
+# Задачи в процессе выполняются последовательно, поэтому одного соединения достаточно
+WORKER_DB_POOL_SIZE = 1
+
+# Шаблон текста уведомления о привычке (HTML)
+# Текст собирается конкатенацией неизменных частей с названием привычки (без разбора шаблона на каждый вызов)
+NOTIFICATION_PREFIX = "⏰ <b>Напоминание!</b>\nПора выполнить привычку: <b>"
+NOTIFICATION_SUFFIX = "</b>"
+
+T = TypeVar("T")
+
+# Event loop и бот процесса воркера.
+# Создаются лениво в дочернем процессе (после fork), живут до завершения процесса и переиспользуются задачами,
+# благодаря чему TCP/TLS соединения с Telegram не устанавливаются заново для каждого сообщения
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+_bot: Bot | None = None
+
+
+def _run_async(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Выполняет корутину в event loop текущего процесса воркера.
+
+    В отличие от `asgiref.async_to_sync`, который создает новый event loop на каждый вызов,
+    использует один loop на процесс, что позволяет переиспользовать соединения aiohttp между задачами.
+
+    Args:
+        coroutine (Coroutine): Корутина для выполнения.
+
+    Returns:
+        T: Результат выполнения корутины.
+    """
+    global _loop, _loop_pid
+
+    # Проверяем PID, чтобы не унаследовать loop родительского процесса после fork
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        # uvloop быстрее планирует колбэки и выполняет сокетные операции aiohttp/psycopg
+        _loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+        _loop_pid = os.getpid()
+
+    return _loop.run_until_complete(coroutine)
+
+
+class TelegramBotSession(AiohttpSession):
+    """
+    HTTP-сессия aiogram с настроенным пулом соединений к Telegram Bot API.
+
+    aiogram позволяет задать только общий лимит соединений, поэтому `TCPConnector` создается здесь,
+    в переопределенных `create_session()`/`close()`, без обращения к внутренним атрибутам aiogram.
+    Сам коннектор создается лениво, при первом запросе внутри event loop.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(limit=TELEGRAM_CONNECTIONS_LIMIT)
+        self._client_session: ClientSession | None = None
+
+    async def create_session(self) -> ClientSession:
+        """
+        Возвращает сессию aiohttp, создавая ее (и пул соединений) при первом обращении.
+
+        Returns:
+            ClientSession: Сессия aiohttp.
+        """
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = ClientSession(
+                connector=TCPConnector(
+                    ssl=ssl.create_default_context(cafile=certifi.where()),
+                    limit=TELEGRAM_CONNECTIONS_LIMIT,
+                    limit_per_host=TELEGRAM_CONNECTIONS_LIMIT_PER_HOST,
+                    ttl_dns_cache=TELEGRAM_DNS_CACHE_TTL,
+                    keepalive_timeout=TELEGRAM_KEEPALIVE_TIMEOUT,
+                ),
+                # Тот же User-Agent, что выставляет сессия aiogram по умолчанию
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+            )
+
+        return self._client_session
+
+    async def close(self) -> None:
+        """Закрывает сессию aiohttp и ее пул соединений."""
+        if self._client_session is not None and not self._client_session.closed:
+            await self._client_session.close()
+
+        await super().close()
+
+
+def _create_bot_session() -> TelegramBotSession:
+    """
+    Создает HTTP-сессию бота с настроенным пулом соединений.
+
+    Returns:
+        TelegramBotSession: Сессия aiohttp для aiogram.
+    """
+    return TelegramBotSession()
+
+
+async def _ensure_db_connected() -> None:
+    """
+    Подключает процесс воркера к БД, если подключение еще не установлено.
+
+    Обычно подключение создается при старте процесса (`worker_process_init`) и живет до его завершения.
+    Повторная попытка здесь нужна для пулов без дочерних процессов и на случай, если БД была недоступна при старте.
+    """
+    if db.session_factory is None:
+        await db.connect(pool_size=WORKER_DB_POOL_SIZE, max_overflow=0)
+
+
+def _get_bot() -> Bot:
+    """
+    Возвращает экземпляр бота текущего процесса воркера, создавая его при первом вызове.
+
+    Returns:
+        Bot: Экземпляр бота aiogram.
+    """
+    global _bot
+
+    if _bot is None:
+        _bot = Bot(
+            token=settings.BOT_TOKEN,
+            session=_create_bot_session(),
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+
+    return _bot
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs: Any) -> None:
+    """
+    Создает бота и подключение к БД при старте дочернего процесса воркера (сигнал `worker_process_init`).
+
+    Так первая задача процесса не тратит время на создание бота и пула соединений.
+    В пулах без дочерних процессов (solo, threads) сигнал не приходит, и ресурсы создаются лениво.
+    """
+    _get_bot()
+
+    try:
+        _run_async(_ensure_db_connected())
+    except Exception as exc:
+        # Не роняем процесс: БД нужна только для редкого сценария блокировки бота, подключимся позже
+        logger.warning(f"Не удалось подключиться к БД при старте процесса воркера: {exc}")
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs: Any) -> None:
+    """
+    Закрывает HTTP-сессию бота, подключение к БД и event loop при завершении процесса воркера
+    (сигнал `worker_process_shutdown`).
+    """
+    global _bot, _loop
+
+    try:
+        # Пул соединений engine привязан к loop процесса, поэтому закрываем его в нем же
+        _run_async(db.disconnect())
+    except Exception as exc:
+        logger.warning(f"Не удалось закрыть подключение к БД: {exc}")
+
+    if _bot is not None:
+        try:
+            # Сессия aiohttp привязана к loop процесса, поэтому закрываем ее в нем же
+            _run_async(_bot.session.close())
+        except Exception as exc:
+            logger.warning(f"Не удалось закрыть сессию бота: {exc}")
+        _bot = None
+
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
+
+
+@lru_cache(maxsize=10_000)
+def _render_notification(habit_name: str) -> str:
+    """
+    Формирует HTML-текст уведомления о привычке.
+
+    Название привычки вводит пользователь, поэтому оно экранируется: иначе символы `<`, `>` и `&`
+    ломают HTML-разметку сообщения, и Telegram отклоняет его. Одна и та же привычка напоминает
+    о себе каждый день, поэтому готовый текст кэшируется.
+
+    Args:
+        habit_name (str): Название привычки.
+
+    Returns:
+        str: Текст уведомления (HTML).
+    """
+    return NOTIFICATION_PREFIX + html.escape(habit_name) + NOTIFICATION_SUFFIX
 
 
 async def _send_telegram_message_async(chat_id: int, text: str) -> None:
     """
     Асинхронная функция отправки сообщения.
-    Создает локальный экземпляр бота, отправляет сообщение и закрывает сессию.
+    Использует общий для процесса экземпляр бота (и его пул соединений).
 
     Args:
         chat_id (int): ID чата/пользователя.
         text (str): Текст сообщения (HTML).
     """
-    # Создаем бота внутри задачи
-    # В Celery каждый процесс живет долго, но задачи изолированы
-    # Менеджер контекста автоматически закроет сессию aiohttp
-    async with Bot(token=settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML)) as bot:
-        await bot.send_message(chat_id=chat_id, text=text)
+    await _get_bot().send_message(chat_id=chat_id, text=text)
 
 
-async def _block_user_async(telegram_id: int) -> None:
+async def _send_telegram_messages_async(notifications: list[dict[str, Any]]) -> list[BaseException | None]:
     """
-    Асинхронная функция изменения пользователя в БД.
-    Меняет значение поля "is_bot_blocked" на True (пользователь заблокировал бота).
+    Асинхронная функция пакетной отправки уведомлений.
+    Отправляет сообщения конкурентно (не более `TELEGRAM_SEND_CONCURRENCY` запросов одновременно)
+    через общий для процесса экземпляр бота.
+
+    Args:
+        notifications (list[dict[str, Any]]): Уведомления (chat_id, habit_name, idempotency_key).
+
+    Returns:
+        list[BaseException | None]: Результат для каждого уведомления (в том же порядке):
+            None при успешной отправке, иначе исключение.
+    """
+    semaphore = asyncio.Semaphore(TELEGRAM_SEND_CONCURRENCY)
+
+    async def send(notification: dict[str, Any]) -> None:
+        async with semaphore:
+            await _send_telegram_message_async(
+                chat_id=notification["chat_id"],
+                text=_render_notification(notification["habit_name"]),
+            )
+
+    return await asyncio.gather(*(send(notification) for notification in notifications), return_exceptions=True)
+
+
+async def _block_users_async(telegram_ids: list[int]) -> None:
+    """
+    Асинхронная функция изменения пользователей в БД.
+    Меняет значение поля "is_bot_blocked" на True (пользователи заблокировали бота).
 
     Используется как fallback, когда Telegram API возвращает ошибку Forbidden.
-    Поскольку Celery-воркер работает отдельно от FastAPI, здесь необходимо
-    явно управлять жизненным циклом подключения к БД.
+    Поскольку Celery-воркер работает отдельно от FastAPI, подключение к БД
+    живет весь срок процесса воркера (см. `_init_worker_process`), а не создается на каждый вызов.
 
     Args:
-        telegram_id (int): Telegram ID пользователя.
+        telegram_ids (list[int]): Telegram ID пользователей.
     """
-    # Явно устанавливаем соединение с БД
-    # В FastAPI это делает lifespan, но в Celery мы должны сделать это сами
-    # Это создаст engine и session_factory
-    await db.connect()
-
     try:
+        # В FastAPI подключение создает lifespan, в воркере - сигнал старта процесса
+        await _ensure_db_connected()
+
         # Открываем сессию
         async with db.session() as session:
             user_repo = UserRepository(User)
 
-            # Ищем пользователя
-            user = await user_repo.get_by_telegram_id(session, telegram_id=telegram_id)
+            # Обновляем флаг is_bot_blocked всех пользователей одним запросом, чтобы больше не пытаться отправлять
+            # им уведомления
+            user_ids = await user_repo.mark_bot_blocked(session, telegram_ids=telegram_ids)
 
-            if user:
-                # Обновляем флаг is_bot_blocked пользователя, чтобы больше не пытаться отправлять ему уведомления
-                await user_repo.update(session, db_obj=user, obj_in={"is_bot_blocked": True})
+            # Фиксируем изменение пользователей
+            await session.commit()
 
-                # Фиксируем изменение пользователя
-                await session.commit()
-                logger.info(f"Пользователю (telegram_id: {telegram_id}) изменен флаг `is_bot_blocked=True`.")
+            if user_ids:
+                logger.info(f"Пользователям (telegram_id: {telegram_ids}) изменен флаг `is_bot_blocked=True`.")
 
-            else:
-                logger.warning(f"Пользователь (telegram_id: {telegram_id}) не найден в БД.")
+            if len(user_ids) < len(set(telegram_ids)):
+                logger.warning(f"Не все пользователи (telegram_id: {telegram_ids}) найдены в БД.")
 
     except Exception as exc:
         # Логируем ошибку, но не роняем воркер
-        logger.error(f"Ошибка при изменении флага `is_bot_blocked=True` пользователя {telegram_id}: {exc}")
-
-    finally:
-        # Закрываем соединение
-        await db.disconnect()
+        logger.error(f"Ошибка при изменении флага `is_bot_blocked=True` пользователей {telegram_ids}: {exc}")
 
 
 @celery_app.task(
     bind=True,  # Дает доступ к экземпляру задачи (self)
-    rate_limit="25/s",  # Rate Limit на уровне задачи (Telegram разрешает ~30)
+    ignore_result=True,  # Результат никто не читает
+    # Повторять задачу только при сбоях Redis до установки ключа идемпотентности. Ошибки отправки
+    # (включая сетевые) обрабатываются ниже, а обращения к Redis после установки ключа защищены от исключений:
+    # иначе повтор был бы пропущен как дубликат
+    autoretry_for=(RedisError,),
+    retry_backoff=5,  # Экспоненциальная пауза между попытками: 5, 10, 20... сек.
+    retry_backoff_max=60,  # Но не дольше минуты
+    retry_jitter=True,  # Случайная пауза в пределах интервала, чтобы повторы не приходили в Telegram пачкой
     max_retries=3,  # Количество попыток при ошибке
-    default_retry_delay=5,  # Пауза между попытками
     acks_late=True,  # Подтверждать задачу только после выполнения
 )
 def send_habit_notification_task(self: Any, chat_id: int, habit_name: str, idempotency_key: str) -> str:
@@ -101,18 +410,39 @@ def send_habit_notification_task(self: Any, chat_id: int, habit_name: str, idemp
 
     Реализует паттерн идемпотентности через Redis: гарантирует, что
     одно и то же уведомление не уйдет дважды даже при сбоях воркера.
+    Скорость отправки ограничивается общим для всех воркеров token bucket в Redis.
+    Задача повторяется при сбоях Redis и при ответе 429 от Telegram; неизвестные ошибки отправки не повторяются.
 
     Args:
         chat_id: Telegram ID пользователя.
         habit_name: Название привычки.
         idempotency_key: Уникальный ключ (habit_id + timestamp).
     """
+    # Одним вызовом проверяем негативный кэш блокировок и берем токен из общей корзины.
+    # Делаем это до установки ключа идемпотентности, иначе отложенная задача была бы пропущена как дубликат
+    token_acquired, wait_ms = _take_telegram_token(
+        keys=[TELEGRAM_RATE_LIMIT_KEY, BLOCKED_CHAT_KEY.format(chat_id=chat_id)],
+        args=[TELEGRAM_RATE_LIMIT_PER_SECOND, TELEGRAM_RATE_LIMIT_BURST, 1],
+    )
+
+    if token_acquired == -1:
+        logger.info(f"Уведомление пропущено: пользователь (telegram_id: {chat_id}) заблокировал бота.")
+        return "Пропущено (бот заблокирован)"
+
+    if not token_acquired:
+        # Лимит исчерпан - ставим задачу в очередь заново. Это не ошибка, поэтому используем apply_async,
+        # а не self.retry, чтобы не тратить попытки max_retries. Случайная добавка к паузе
+        # не дает всем отложенным задачам вернуться одновременно
+        self.apply_async(
+            kwargs={"chat_id": chat_id, "habit_name": habit_name, "idempotency_key": idempotency_key},
+            countdown=wait_ms / 1000 + random.random(),  # noqa: S311 - джиттер, не криптография
+        )
+        return "Отложено (rate limit)"
+
     # Пытаемся установить ключ в Redis (идемпотентность)
-    lock_acquired = redis_client.set(
-        f"lock:notification:{idempotency_key}",
-        "sent",
-        nx=True,  # Not Exists - запишет только если ключа нет
-        ex=86400,  # TTL - ключ протухнет через 24 часа (для автоочистки)
+    lock_acquired = _acquire_notification_lock(
+        keys=[f"lock:notification:{idempotency_key}"],
+        args=[NOTIFICATION_LOCK_TTL],
     )
 
     if not lock_acquired:
@@ -120,25 +450,40 @@ def send_habit_notification_task(self: Any, chat_id: int, habit_name: str, idemp
         return "Пропущено (дубликат)"
 
     # Формируем текст уведомления
-    notification = f"⏰ <b>Напоминание!</b>\nПора выполнить привычку: <b>{habit_name}</b>"
+    notification = _render_notification(habit_name)
 
     try:
-        # Запускаем асинхронный код в синхронном окружении Celery
-        async_to_sync(_send_telegram_message_async)(chat_id=chat_id, text=notification)
+        # Запускаем асинхронный код в event loop процесса воркера
+        _run_async(_send_telegram_message_async(chat_id=chat_id, text=notification))
         logger.info(f"✅ Напоминание отправлено пользователю (telegram_id: {chat_id}, habit_name: {habit_name})")
         return "Отправлено"
 
     except TelegramRetryAfter as exc:
         # Если Telegram просит подождать (429 Too Many Requests)
         logger.warning(f"Ограничение количества запросов в Telegram. Ожидание {exc.retry_after} сек.")
-        # Ретраим задачу через указанное время
+        # Сообщение не отправлено: снимаем ключ идемпотентности, иначе повтор будет пропущен как дубликат
+        try:
+            redis_client.delete(f"lock:notification:{idempotency_key}")
+        except RedisError as redis_exc:
+            # Ключ не снят: повтор все равно был бы пропущен как дубликат, поэтому не ретраим
+            logger.error(f"❌ Не удалось снять ключ идемпотентности {idempotency_key}, повтора не будет: {redis_exc}")
+            return "Ошибка отправки"
+        # Ретраим задачу явно через указанное Telegram время: оно важнее расписания autoretry
         raise self.retry(exc=exc, countdown=exc.retry_after) from exc
 
     except TelegramForbiddenError:
         # Пользователь заблокировал бота
         logger.warning(f"🚫 Пользователь (telegram_id: {chat_id}) заблокировал бота.")
-        # Запускаем задачу для обновления "is_bot_blocked" пользователя в БД
-        async_to_sync(_block_user_async)(telegram_id=chat_id)
+        # Обновляем "is_bot_blocked" пользователя в БД в том же event loop процесса воркера
+        _run_async(_block_users_async(telegram_ids=[chat_id]))
+        # Запоминаем блокировку, чтобы остальные уведомления пользователя из очереди не ходили в Telegram.
+        # Кэш необязателен (флаг в БД уже обновлен), поэтому сбой Redis только логируем
+        try:
+            redis_client.set(BLOCKED_CHAT_KEY.format(chat_id=chat_id), 1, ex=BLOCKED_CHAT_TTL)
+        except RedisError as redis_exc:
+            logger.warning(
+                f"Не удалось закэшировать блокировку бота пользователем (telegram_id: {chat_id}): {redis_exc}"
+            )
         return "Пользователь заблокировал бота"
 
     except TelegramBadRequest as exc:
@@ -147,6 +492,139 @@ def send_habit_notification_task(self: Any, chat_id: int, habit_name: str, idemp
         return "Ошибка Telegram API"
 
     except Exception as exc:
-        logger.error(f"❌ Непредвиденная ошибка при отправке напоминания пользователю (telegram_id: {chat_id}): {exc}")
-        # В случае неизвестной ошибки, не удаляем лок, чтобы не спамить пользователя
-        raise self.retry(exc=exc) from exc
+        # Неизвестная ошибка не повторяется: сообщение могло быть доставлено (например, при обрыве соединения
+        # после отправки), поэтому лок не удаляем, чтобы не спамить пользователя
+        logger.error(
+            f"❌ Непредвиденная ошибка при отправке напоминания пользователю (telegram_id: {chat_id}), "
+            f"повтора не будет: {exc}"
+        )
+        return "Ошибка отправки"
+
+
+@celery_app.task(
+    bind=True,  # Дает доступ к экземпляру задачи (self)
+    ignore_result=True,  # Результат никто не читает
+    # Сбой Redis до отправки не должен терять весь пакет. Повтор безопасен: уже отправленные
+    # уведомления защищены ключами идемпотентности и будут пропущены как дубликаты.
+    # Обращения к Redis после отправки защищены от исключений, чтобы не повторять пакет целиком
+    autoretry_for=(RedisError,),
+    retry_backoff=5,  # Экспоненциальная пауза между попытками: 5, 10, 20... сек.
+    retry_backoff_max=60,  # Но не дольше минуты
+    retry_jitter=True,  # Случайная пауза в пределах интервала
+    max_retries=3,  # Количество попыток при ошибке
+    acks_late=True,  # Подтверждать задачу только после выполнения
+)
+def send_habit_notifications_batch_task(self: Any, notifications: list[dict[str, Any]]) -> str:
+    """
+    Задача пакетной отправки уведомлений о привычках.
+
+    В отличие от `send_habit_notification_task` обрабатывает до `NOTIFICATION_BATCH_SIZE` уведомлений
+    за один вызов: проверки в Redis выполняются pipeline'ами, токены берутся из общей корзины разом,
+    а сообщения отправляются конкурентно в event loop процесса воркера.
+    Идемпотентность и лимит скорости - те же, что и у одиночной задачи.
+
+    Args:
+        notifications: Уведомления (аргументы `send_habit_notification_task`: chat_id, habit_name, idempotency_key).
+    """
+    # Отбрасываем пользователей из негативного кэша блокировок (один round-trip)
+    with redis_client.pipeline(transaction=False) as pipe:
+        for notification in notifications:
+            pipe.exists(BLOCKED_CHAT_KEY.format(chat_id=notification["chat_id"]))
+        blocked_flags = pipe.execute()
+
+    pending = [
+        notification for notification, is_blocked in zip(notifications, blocked_flags, strict=True) if not is_blocked
+    ]
+
+    if not pending:
+        return "Пропущено (бот заблокирован)"
+
+    # Берем из общей корзины сразу нужное количество токенов. Не хватило - откладываем остаток отдельной задачей
+    # (до установки ключей идемпотентности, иначе отложенные уведомления были бы пропущены как дубликаты)
+    granted, wait_ms = _take_telegram_token(
+        keys=[TELEGRAM_RATE_LIMIT_KEY],
+        args=[TELEGRAM_RATE_LIMIT_PER_SECOND, TELEGRAM_RATE_LIMIT_BURST, len(pending)],
+    )
+
+    deferred_count = len(pending) - granted
+
+    if deferred_count:
+        self.apply_async(
+            kwargs={"notifications": pending[granted:]},
+            countdown=wait_ms / 1000 + random.random(),  # noqa: S311 - джиттер, не криптография
+        )
+        pending = pending[:granted]
+
+    # Устанавливаем ключи идемпотентности всех уведомлений (один round-trip)
+    with redis_client.pipeline(transaction=False) as pipe:
+        for notification in pending:
+            pipe.set(
+                f"lock:notification:{notification['idempotency_key']}",
+                "sent",
+                nx=True,
+                ex=NOTIFICATION_LOCK_TTL,
+            )
+        lock_flags = pipe.execute()
+
+    to_send = [notification for notification, is_locked in zip(pending, lock_flags, strict=True) if is_locked]
+
+    # Отправляем все сообщения в event loop процесса воркера
+    results = _run_async(_send_telegram_messages_async(to_send)) if to_send else []
+
+    sent_count = 0
+    blocked_chat_ids: list[int] = []
+    rate_limited: list[dict[str, Any]] = []
+    retry_after = 0
+
+    for notification, result in zip(to_send, results, strict=True):
+        chat_id = notification["chat_id"]
+
+        if result is None:
+            sent_count += 1
+
+        elif isinstance(result, TelegramRetryAfter):
+            # Telegram просит подождать (429 Too Many Requests) - сообщение не отправлено
+            rate_limited.append(notification)
+            retry_after = max(retry_after, result.retry_after)
+
+        elif isinstance(result, TelegramForbiddenError):
+            # Пользователь заблокировал бота
+            logger.warning(f"🚫 Пользователь (telegram_id: {chat_id}) заблокировал бота.")
+            blocked_chat_ids.append(chat_id)
+
+        else:
+            # Как и в одиночной задаче, лок не удаляем, чтобы не спамить пользователя
+            logger.error(f"❌ Ошибка при отправке напоминания пользователю (telegram_id: {chat_id}): {result}")
+
+    if blocked_chat_ids:
+        # Обновляем флаги всех пользователей одним UPDATE
+        _run_async(_block_users_async(telegram_ids=blocked_chat_ids))
+
+        # Запоминаем блокировки (один round-trip). Кэш необязателен (флаги в БД уже обновлены),
+        # поэтому сбой Redis только логируем
+        try:
+            with redis_client.pipeline(transaction=False) as pipe:
+                for chat_id in blocked_chat_ids:
+                    pipe.set(BLOCKED_CHAT_KEY.format(chat_id=chat_id), 1, ex=BLOCKED_CHAT_TTL)
+                pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Не удалось закэшировать блокировки бота (telegram_id: {blocked_chat_ids}): {exc}")
+
+    if rate_limited:
+        logger.warning(f"Ограничение количества запросов в Telegram. Ожидание {retry_after} сек.")
+        # Сообщения не были отправлены: снимаем их ключи идемпотентности и ставим в очередь заново.
+        # Если ключи снять не удалось, повтор был бы пропущен как дубликат, поэтому в очередь не ставим
+        try:
+            redis_client.delete(
+                *(f"lock:notification:{notification['idempotency_key']}" for notification in rate_limited)
+            )
+        except RedisError as exc:
+            logger.error(f"❌ Не удалось снять ключи идемпотентности, {len(rate_limited)} уведомлений потеряно: {exc}")
+        else:
+            self.apply_async(kwargs={"notifications": rate_limited}, countdown=retry_after)
+
+    logger.info(
+        f"✅ Пакет уведомлений обработан: отправлено {sent_count} из {len(notifications)}, "
+        f"заблокировали бота {len(blocked_chat_ids)}, отложено {deferred_count + len(rate_limited)}."
+    )
+    return f"Отправлено: {sent_count}"
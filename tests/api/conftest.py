@@ -10,13 +10,30 @@ from src.api.main import app
 # --- ФИКСТУРЫ, СПЕЦИФИЧНЫЕ ДЛЯ ТЕСТИРОВАНИЯ API ---
 
 
+@pytest_asyncio.fixture(scope="session")
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    """
+    Создает один HTTP-клиент FastAPI (и ASGI-транспорт) для всей тестовой сессии.
+
+    Напрямую в тестах не используется: изоляцию БД для каждого теста добавляет фикстура `test_client`.
+    """
+    # Создаем транспорт для ASGI приложения (исключения приложения пробрасываются в тест)
+    transport = ASGITransport(app=app, raise_app_exceptions=True)
+
+    # Создаем асинхронный HTTP-клиент с транспортом для взаимодействия с приложением.
+    # timeout=None: запросы не уходят в сеть, таймауты на каждый запрос не нужны
+    async with AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:  # noqa: S113 - ASGI без сети
+        yield client
+
+
 @pytest_asyncio.fixture(scope="function")
-async def test_client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def test_client(async_client: AsyncClient, db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
-    Создает и предоставляет тестовый клиент FastAPI для каждого API-теста.
+    Предоставляет тестовый клиент FastAPI для каждого API-теста.
 
-    Зависит от фикстуры `db_session` (в корневом conftest.py)
-    для переопределения зависимости get_db_session и обеспечения изоляции транзакций.
+    Сам клиент общий для сессии (`async_client`), для каждого теста меняется только
+    переопределение зависимости get_db_session на фикстуру `db_session` (в корневом conftest.py),
+    что обеспечивает изоляцию транзакций.
     """
 
     # Функция для переопределения зависимости `get_db_session` в приложении
@@ -26,12 +43,7 @@ async def test_client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, N
     # Применяем переопределение
     app.dependency_overrides[get_db_session] = override_get_db_session
 
-    # Создаем транспорт для ASGI приложения
-    transport = ASGITransport(app=app)
-
-    # Создаем асинхронный HTTP-клиент с транспортом для взаимодействия с приложением
-    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
-        yield test_client
+    yield async_client
 
     # Очищаем переопределение после теста
     del app.dependency_overrides[get_db_session]
@@ -1,29 +1,30 @@
 from datetime import date
+from typing import Awaitable, Callable
 
 import pytest
 from httpx import AsyncClient
 from starlette import status
 
+from src.api.models import Habit
+
 # Помечаем все тесты в модуле как асинхронные
 pytestmark = pytest.mark.asyncio
 
 
-async def test_mark_habit_done_and_check_streak(test_client: AsyncClient, user_auth_headers: dict[str, str]):
+async def test_mark_habit_done_and_check_streak(
+    test_client: AsyncClient,
+    user_auth_headers: dict[str, str],
+    habit_factory: Callable[..., Awaitable[Habit]],
+):
     """
     Сценарий:
     1. Создать привычку.
     2. Выполнить сегодня -> Стрик 1.
     3. Отменить выполнение -> Стрик 0.
     """
-    # Создаем привычку
-    payload = {
-        "name": "Streak Test",
-        "time_to_remind": "10:00",
-        "target_days": 5,
-    }
-
-    response = await test_client.post("/api/v1/habits/", json=payload, headers=user_auth_headers)
-    habit_id = response.json()["id"]
+    # Создаем привычку напрямую в БД (создание через API проверяется в test_habits.py)
+    habit = await habit_factory(name="Streak Test", target_days=5)
+    habit_id = habit.id
 
     # Выполняем (DONE)
     execution_response = await test_client.post(
@@ -80,16 +81,15 @@ async def test_mark_habit_done_and_check_streak(test_client: AsyncClient, user_a
     assert is_pending_today is True
 
 
-async def test_streak_calculation_idempotency(test_client: AsyncClient, user_auth_headers: dict[str, str]):
+async def test_streak_calculation_idempotency(
+    test_client: AsyncClient,
+    user_auth_headers: dict[str, str],
+    habit_factory: Callable[..., Awaitable[Habit]],
+):
     """Проверка идемпотентности: повторная отправка DONE не должна увеличивать стрик дважды."""
     # Создаем привычку
-    payload = {
-        "name": "Idempotency",
-        "time_to_remind": "10:00",
-    }
-
-    response = await test_client.post("/api/v1/habits/", json=payload, headers=user_auth_headers)
-    habit_id = response.json()["id"]
+    habit = await habit_factory(name="Idempotency")
+    habit_id = habit.id
 
     # Выполняем 1 раз
     await test_client.post(f"/api/v1/habits/{habit_id}/executions/", json={"status": "done"}, headers=user_auth_headers)
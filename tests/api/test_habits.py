@@ -1,6 +1,7 @@
+from typing import Awaitable, Callable
+
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
@@ -26,11 +27,10 @@ async def test_create_habit(test_client: AsyncClient, user_auth_headers: dict[st
     assert data["name"] == payload["name"]
     assert data["current_streak"] == 0
 
-    # Проверяем в БД
-    statement = select(Habit).where(Habit.name == "Drink Water")
-    result = await db_session.execute(statement)
-    habit = result.scalar_one_or_none()
+    # Проверяем в БД (поиск по первичному ключу)
+    habit = await db_session.get(Habit, data["id"])
     assert habit is not None
+    assert habit.name == payload["name"]
 
 
 async def test_get_habits_list(test_client: AsyncClient, user_auth_headers: dict[str, str]):
@@ -54,16 +54,15 @@ async def test_get_habits_list(test_client: AsyncClient, user_auth_headers: dict
     assert response.json()[0]["is_done_today"] is False  # Проверка вычисляемого поля
 
 
-async def test_delete_habit(test_client: AsyncClient, user_auth_headers: dict[str, str]):
+async def test_delete_habit(
+    test_client: AsyncClient,
+    user_auth_headers: dict[str, str],
+    habit_factory: Callable[..., Awaitable[Habit]],
+):
     """Тест удаления привычки."""
     # Создаем привычку
-    payload = {
-        "name": "To Delete",
-        "time_to_remind": "10:00",
-    }
-
-    create_response = await test_client.post("/api/v1/habits/", json=payload, headers=user_auth_headers)
-    habit_id = create_response.json()["id"]
+    habit = await habit_factory(name="To Delete")
+    habit_id = habit.id
 
     # Удаляем привычку
     delete_response = await test_client.delete(f"/api/v1/habits/{habit_id}", headers=user_auth_headers)
@@ -91,8 +90,8 @@ async def test_security_cannot_delete_others_habit(
         time_to_remind="10:00",
     )
     db_session.add(habit)
-    await db_session.commit()
-    await db_session.refresh(habit)
+    # flush достаточно: id уже заполнен, а транзакция теста все равно откатится
+    await db_session.flush()
 
     # Пытаемся удалить её, используя токены "первого юзера"
     response = await test_client.delete(f"/api/v1/habits/{habit.id}", headers=user_auth_headers)
@@ -101,6 +100,4 @@ async def test_security_cannot_delete_others_habit(
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
     # Убедимся, что привычка все еще в БД
-    statement = select(Habit).where(Habit.id == habit.id)
-    result = await db_session.execute(statement)
-    assert result.scalar_one_or_none() is not None
+    assert await db_session.get(Habit, habit.id) is not None
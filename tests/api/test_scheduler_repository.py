@@ -1,10 +1,12 @@
-from datetime import datetime, time
+import os
+from datetime import date, datetime, time, timedelta
 
 import pytest
+from sqlalchemy import Date, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.models import Habit, User
-from src.api.repositories import HabitRepository
+from src.api.models import Habit, HabitExecution, HabitExecutionStatus, User
+from src.api.repositories import HabitRepository, UserRepository
 
 # Помечаем все тесты в модуле как асинхронные
 pytestmark = pytest.mark.asyncio
@@ -40,33 +42,174 @@ async def test_get_habits_for_notification(db_session: AsyncSession):
     db_session.add(habit)
     await db_session.commit()
 
-    # Тест 1: Ищем по правильной таймзоне и времени -> должны найти
-    # Важно: target_date нужна для проверки "не выполнено ли уже", но пока выполнений нет
-    dummy_date = datetime.now().date()
+    # Важно: target_date нужна для проверки "не выполнено ли уже"
+    target_date = datetime.now().date()
 
-    habits = await repo.get_habits_for_notification(
-        db_session, timezone="Asia/Yekaterinburg", target_time=target_time, target_date=dummy_date
+    # Тест 1: Ищем по правильной таймзоне и времени -> должны найти
+    habits = await repo.get_habits_for_notification_bulk(
+        db_session, targets=[("Asia/Yekaterinburg", target_time, target_date)]
     )
 
-    assert len(habits) == 1
-    assert habits[0].id == habit.id
+    assert [found_habit.id for found_habit in habits] == [habit.id]
 
     # Тест 2: Ищем по неправильному времени -> пусто
-    habits_wrong_time = await repo.get_habits_for_notification(
-        db_session,
-        timezone="Asia/Yekaterinburg",
-        target_time=time(10, 0),  # Другое время
-        target_date=dummy_date,
+    habits_wrong_time = await repo.get_habits_for_notification_bulk(
+        db_session, targets=[("Asia/Yekaterinburg", time(10, 0), target_date)]
     )
 
     assert len(habits_wrong_time) == 0
 
-    # Тест 3: Ищем по неправильной таймзоне -> пусто
-    habits_wrong_tz = await repo.get_habits_for_notification(
+    # Тест 3: Ищем по другой или несуществующей таймзоне -> пусто
+    habits_wrong_tz = await repo.get_habits_for_notification_bulk(
         db_session,
-        timezone="Europe/Moscow",  # Другая зона
-        target_time=target_time,
-        target_date=dummy_date,
+        targets=[
+            ("Europe/Moscow", target_time, target_date),
+            ("Unknown/Timezone", target_time, target_date),
+        ],
     )
 
     assert len(habits_wrong_tz) == 0
+
+    # Тест 4: Выполнение (DONE) за другую дату не мешает напоминанию
+    db_session.add(
+        HabitExecution(
+            habit_id=habit.id,
+            execution_date=target_date - timedelta(days=1),
+            status=HabitExecutionStatus.DONE,
+        )
+    )
+    await db_session.commit()
+
+    habits_done_yesterday = await repo.get_habits_for_notification_bulk(
+        db_session, targets=[("Asia/Yekaterinburg", target_time, target_date)]
+    )
+
+    assert [found_habit.id for found_habit in habits_done_yesterday] == [habit.id]
+
+    # Тест 5: Привычка уже выполнена (DONE) на целевую дату -> пусто
+    db_session.add(HabitExecution(habit_id=habit.id, execution_date=target_date, status=HabitExecutionStatus.DONE))
+    await db_session.commit()
+
+    habits_done = await repo.get_habits_for_notification_bulk(
+        db_session, targets=[("Asia/Yekaterinburg", target_time, target_date)]
+    )
+
+    assert len(habits_done) == 0
+
+
+async def test_get_habits_for_notification_bulk(db_session: AsyncSession):
+    """Проверяет, что пакетный запрос находит привычки сразу по нескольким парам (таймзона, время)."""
+    repo = HabitRepository(Habit)
+
+    # Создаем пользователей в разных таймзонах
+    user_ekb = User(telegram_id=556, username="ekb_user", timezone="Asia/Yekaterinburg")
+    user_msk = User(telegram_id=557, username="msk_user", timezone="Europe/Moscow")
+
+    db_session.add_all([user_ekb, user_msk])
+    await db_session.flush()
+
+    # Привычки на 09:00 (Екатеринбург) и 07:00 (Москва)
+    habit_ekb = Habit(user_id=user_ekb.id, name="Ekb Habit", time_to_remind=time(9, 0), target_days=21)
+    habit_msk = Habit(user_id=user_msk.id, name="Msk Habit", time_to_remind=time(7, 0), target_days=21)
+
+    db_session.add_all([habit_ekb, habit_msk])
+    await db_session.commit()
+
+    dummy_date = datetime.now().date()
+
+    # Оба кортежа совпадают -> находим обе привычки, отсортированные по таймзоне
+    habits = await repo.get_habits_for_notification_bulk(
+        db_session,
+        targets=[
+            ("Europe/Moscow", time(7, 0), dummy_date),
+            ("Asia/Yekaterinburg", time(9, 0), dummy_date),
+        ],
+    )
+
+    assert [habit.id for habit in habits] == [habit_ekb.id, habit_msk.id]
+
+    # Время одной таймзоны не должно "переноситься" на другую
+    habits_crossed = await repo.get_habits_for_notification_bulk(
+        db_session,
+        targets=[
+            ("Europe/Moscow", time(9, 0), dummy_date),
+            ("Asia/Yekaterinburg", time(7, 0), dummy_date),
+        ],
+    )
+
+    assert len(habits_crossed) == 0
+
+    # Пустой набор таймзон -> пустой результат без запроса к БД
+    assert await repo.get_habits_for_notification_bulk(db_session, targets=[]) == []
+
+
+async def test_mark_bot_blocked(db_session: AsyncSession):
+    """Проверяет, что флаг is_bot_blocked ставится одним UPDATE и только нужным пользователям."""
+    repo = UserRepository(User)
+
+    blocked_user = User(telegram_id=777, username="blocked_user", timezone="UTC")
+    other_user = User(telegram_id=778, username="other_user", timezone="UTC")
+
+    db_session.add_all([blocked_user, other_user])
+    await db_session.flush()
+
+    # Возвращаются ID найденных пользователей, несуществующий Telegram ID пропускается
+    user_ids = await repo.mark_bot_blocked(db_session, telegram_ids=[777, 999])
+    assert list(user_ids) == [blocked_user.id]
+
+    # Перечитываем состояние из БД (UPDATE выполнен в обход ORM)
+    await db_session.refresh(blocked_user)
+    await db_session.refresh(other_user)
+
+    assert blocked_user.is_bot_blocked is True
+    assert other_user.is_bot_blocked is False
+
+
+# Pacific/Kiritimati (UTC+14) и Pacific/Pago_Pago (UTC-11): в любой момент суток хотя бы у одной из них
+# локальная дата отличается от даты по UTC
+@pytest.mark.skipif(
+    os.getenv("PYTEST_FAST_SCHEMA") == "1",
+    reason="SQL-функция user_today создается только миграциями",
+)
+@pytest.mark.parametrize("timezone", ["UTC", "Pacific/Kiritimati", "Pacific/Pago_Pago"])
+async def test_reset_missed_streaks(db_session: AsyncSession, timezone: str):
+    """Проверяет, что стрик сбрасывается только у привычек, пропущенных вчера по таймзоне пользователя."""
+    repo = HabitRepository(Habit)
+
+    user = User(telegram_id=560, username="streak_user", timezone=timezone)
+    db_session.add(user)
+    await db_session.flush()
+
+    # "Сегодня" пользователя считаем той же SQL-функцией, что и репозиторий
+    # (now() в PostgreSQL - время начала транзакции, поэтому дата не зависит от часов Python)
+    today: date = await db_session.scalar(select(func.user_today(timezone, type_=Date)))
+
+    async def create_habit_done_on(name: str, done_date: date | None) -> Habit:
+        habit = Habit(user_id=user.id, name=name, time_to_remind=time(9, 0), target_days=21, current_streak=3)
+        db_session.add(habit)
+        await db_session.flush()
+
+        if done_date is not None:
+            db_session.add(
+                HabitExecution(habit_id=habit.id, execution_date=done_date, status=HabitExecutionStatus.DONE)
+            )
+            await db_session.flush()
+
+        return habit
+
+    done_yesterday = await create_habit_done_on("Done yesterday", today - timedelta(days=1))
+    done_today = await create_habit_done_on("Done today", today)
+    done_long_ago = await create_habit_done_on("Done two days ago", today - timedelta(days=2))
+    never_done = await create_habit_done_on("Never done", None)
+
+    reset_habit_ids = set(await repo.reset_missed_streaks(db_session))
+
+    assert done_yesterday.id not in reset_habit_ids
+    assert done_today.id not in reset_habit_ids
+    assert done_long_ago.id in reset_habit_ids
+    assert never_done.id in reset_habit_ids
+
+    # Стрики в БД: сохранены у выполненных вчера/сегодня, сброшены у остальных
+    for habit, expected_streak in [(done_yesterday, 3), (done_today, 3), (done_long_ago, 0), (never_done, 0)]:
+        await db_session.refresh(habit)
+        assert habit.current_streak == expected_streak
@@ -0,0 +1,30 @@
+import pytest
+
+from src.worker.tasks import TELEGRAM_CONNECTIONS_LIMIT_PER_HOST, TelegramBotSession, _render_notification
+
+# Помечаем все тесты в модуле как асинхронные
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bot_session_connector_settings():
+    """Проверяет, что сессия бота создает пул соединений с нашими настройками."""
+    session = TelegramBotSession()
+
+    try:
+        client_session = await session.create_session()
+        assert client_session.connector is not None
+        assert client_session.connector.limit_per_host == TELEGRAM_CONNECTIONS_LIMIT_PER_HOST
+        # User-Agent aiogram сохраняется
+        assert "aiogram/" in client_session.headers["User-Agent"]
+
+        # Повторный вызов возвращает ту же сессию (пул соединений переиспользуется)
+        assert await session.create_session() is client_session
+    finally:
+        await session.close()
+
+    assert client_session.closed
+
+
+async def test_render_notification_escapes_habit_name():
+    """Проверяет, что название привычки экранируется и не ломает HTML-разметку уведомления."""
+    assert "<b>&lt;b&gt;&amp;</b>" in _render_notification("<b>&")